@@ -38,6 +38,8 @@ class ConfigManager:
         self.config_path = resource_path(self.CONFIG_FILE_NAME)
         # Initialize configparser instance
         self.parser = configparser.ConfigParser()
+        # Incremented on every successful set() so callers can cache derived data
+        self.version = 0
         self._load_config()
 
     def _load_config(self):
@@ -154,6 +156,7 @@ class ConfigManager:
             self.parser.add_section(self.CONFIG_SECTION)
         self.parser.set(self.CONFIG_SECTION, key, value)
         self._save_config()
+        self.version += 1
         print(f"Configuration updated: '{key}' changed from '{old_value}' to '{value}'.")
         return True
 
@@ -164,6 +167,14 @@ class ConfigManager:
         # If still not found, use the provided default argument
         return self.config.get(key, self.parser.get(self.CONFIG_SECTION, key, fallback=default))
 
+    def get_many(self, prefix):
+        """Gets all configuration values whose key starts with prefix, keyed without the prefix."""
+        return {
+            key[len(prefix):]: value
+            for key, value in self.config.items()
+            if key.startswith(prefix)
+        }
+
     def is_color_enabled(self):
         """Checks if color output is enabled."""
         return self.get("enable-color", "1") == "1"
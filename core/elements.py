@@ -4,11 +4,15 @@ import sys
 import shutil, unicodedata
 from textwrap import wrap
 from wcwidth import wcswidth
-import requests
 from core.braillify import braillify
 from core.image_render import image_to_terminal_art
+from core.session import make_session
 from core.ansi import *
 
+# Shared by every ImageElement so images from the same host reuse one
+# keep-alive connection instead of a new TCP/TLS handshake each
+_image_session = make_session()
+
 
 class Box:
     # Unicode border characters
@@ -735,7 +739,7 @@ class ImageElement:
                 if self.base_url:
                     image_url = self.base_url.rstrip("/") + self.src
 
-            response = requests.get(image_url, timeout=5)
+            response = _image_session.get(image_url, timeout=5)
             response.raise_for_status()
             image_file = io.BytesIO(response.content)
 
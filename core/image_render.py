@@ -4,82 +4,74 @@ import sys
 from core.ansi import *
 
 
-# These caches are only used when enable_true_color is False.
-# For true-color, numpy vectorization is used, which is faster.
-_ansi_fg_cache = {}
-_ansi_bg_cache = {}
-
-def get_cached_fg(r, g, b):
-    # This is called when true_color is False.
-    # The true_color parameter is now removed from the signature
-    # as it's handled by the calling logic.
-    key = (r, g, b)
-    if key not in _ansi_fg_cache:
-        _ansi_fg_cache[key] = f"\x1b[38;5;{rgb_to_256_ansi(r, g, b)}m"
-    return _ansi_fg_cache[key]
-
-def get_cached_bg(r, g, b):
-    # Similar to get_cached_fg, optimized for the non-true-color path.
-    key = (r, g, b)
-    if key not in _ansi_bg_cache:
-        _ansi_bg_cache[key] = f"\x1b[48;5;{rgb_to_256_ansi(r, g, b)}m"
-    return _ansi_bg_cache[key]
+# Every 256-color escape, indexed by color number. There are only 256 of
+# each, so they are built once here instead of cached per (r, g, b).
+_FG256 = tuple(f"\x1b[38;5;{i}m" for i in range(256))
+_BG256 = tuple(f"\x1b[48;5;{i}m" for i in range(256))
+
+# The same tables as object arrays, for indexing with whole index arrays
+_FG256_ARRAY = np.array(_FG256, dtype=object)
+_BG256_ARRAY = np.array(_BG256, dtype=object)
+
+_CUBE_WEIGHTS = np.array([36, 6, 1], dtype=np.uint16)
+# Gray ramp index for each level of a pixel with r == g == b
+_GRAY_LUT = np.array(
+    [16 if v < 8 else 231 if v > 248 else 232 + v * 23 // 255 for v in range(256)],
+    dtype=np.uint16,
+)
+
+def quantize_256(pixels):
+    # Same mapping as rgb_to_256_ansi, applied to a whole (..., 3) array at
+    # once. Works in place on one uint16 buffer: every pixel is scaled into
+    # the 6x6x6 cube, then only the gray pixels are moved to the gray ramp.
+    levels = pixels.astype(np.uint16)
+    levels *= 5
+    levels //= 255
+    indices = levels @ _CUBE_WEIGHTS
+    indices += 16
+
+    r = pixels[..., 0]
+    is_gray = (r == pixels[..., 1]) & (r == pixels[..., 2])
+    indices[is_gray] = _GRAY_LUT.take(r[is_gray])
+    return indices
+
+def _escape_runs(indices, table):
+    # Escape for each cell from its color index, left empty where the cell
+    # has the same color as the one before it in the row: the terminal is
+    # still using that color, so only changes need to be sent.
+    codes = table[indices]
+    codes[:, 1:][indices[:, 1:] == indices[:, :-1]] = ""
+    return codes
+
+def _true_color_codes(pixels, prefix):
+    # Pack each pixel into one integer so every distinct color has its escape
+    # formatted once, then scatter the escapes back over the image.
+    packed = (
+        (pixels[..., 0].astype(np.uint32) << 16)
+        | (pixels[..., 1].astype(np.uint32) << 8)
+        | pixels[..., 2]
+    )
+    colors, inverse = np.unique(packed, return_inverse=True)
+    codes = np.array(
+        [f"{prefix}{c >> 16};{(c >> 8) & 255};{c & 255}m" for c in colors.tolist()],
+        dtype=object,
+    )
+    return _escape_runs(inverse.reshape(packed.shape), codes)
 
 def generate_ansi_arrays_true_color(top_rows, bottom_rows):
-    # This function is already quite optimized due to NumPy's vectorization.
-    # No significant changes needed here.
-    r_fg = bottom_rows[..., 0].astype(str)
-    g_fg = bottom_rows[..., 1].astype(str)
-    b_fg = bottom_rows[..., 2].astype(str)
-
-    r_bg = top_rows[..., 0].astype(str)
-    g_bg = top_rows[..., 1].astype(str)
-    b_bg = top_rows[..., 2].astype(str)
-
-    # Use f-strings for clarity and potentially better performance in some Python versions
-    fg_codes = np.char.add("\x1b[38;2;", np.char.add(r_fg, np.char.add(";", np.char.add(g_fg, np.char.add(";", np.char.add(b_fg, "m"))))))
-    bg_codes = np.char.add("\x1b[48;2;", np.char.add(r_bg, np.char.add(";", np.char.add(g_bg, np.char.add(";", np.char.add(b_bg, "m"))))))
-
+    fg_codes = _true_color_codes(bottom_rows, "\x1b[38;2;")
+    bg_codes = _true_color_codes(top_rows, "\x1b[48;2;")
     return fg_codes, bg_codes
 
 def generate_ansi_arrays_256_color(top_rows, bottom_rows):
-    # Vectorized approach for 256-color mode as well.
-    # Apply rgb_to_256_ansi to entire arrays using np.vectorize
-    # This significantly speeds up the non-true-color path by avoiding Python loops
-    # for each pixel's color conversion.
-    
-    # We create a vectorized version of rgb_to_256_ansi.
-    # The 'otypes' argument is crucial for performance, indicating the output type.
-    # Since rgb_to_256_ansi returns an integer, we use int.
-    v_rgb_to_256_ansi = np.vectorize(rgb_to_256_ansi, otypes=[np.int16]) # Use int16 as 256 is small
-
-    # Apply the vectorized function to all RGB tuples in one go.
-    # We reshape to (N, 3) to apply the function to each (R, G, B) triplet.
-    top_256 = v_rgb_to_256_ansi(top_rows[..., 0], top_rows[..., 1], top_rows[..., 2]).astype(str)
-    bottom_256 = v_rgb_to_256_ansi(bottom_rows[..., 0], bottom_rows[..., 1], bottom_rows[..., 2]).astype(str)
-
-    # Now construct the ANSI strings using vectorized string operations.
-    fg_codes = np.char.add("\x1b[38;5;", np.char.add(bottom_256, "m"))
-    bg_codes = np.char.add("\x1b[48;5;", np.char.add(top_256, "m"))
-
+    # Quantize both halves in NumPy, then look the escapes up by color number
+    fg_codes = _escape_runs(quantize_256(bottom_rows), _FG256_ARRAY)
+    bg_codes = _escape_runs(quantize_256(top_rows), _BG256_ARRAY)
     return fg_codes, bg_codes
 
 
-def image_to_terminal_art(image_file_or_path, target_width_pixels=None, target_height_pixels=None,
-                          max_width_chars=75, char_aspect_ratio=0.5, enable_true_color=True):
-    try:
-        # Use a context manager for the image to ensure it's closed
-        with Image.open(image_file_or_path) as img:
-            img = img.convert("RGB")
-    except FileNotFoundError:
-        print(f"File not found: {image_file_or_path}", file=sys.stderr)
-        return
-    except Exception as e:
-        print(f"Error opening image: {e}", file=sys.stderr)
-        return
-
-    orig_w, orig_h = img.size
-
+def _art_size(orig_w, orig_h, target_width_pixels, target_height_pixels,
+              max_width_chars, char_aspect_ratio):
     # --- Resizing Logic Optimization ---
     # Simplified and combined calculations for target dimensions.
     # The goal is to calculate the final `width` and `height` (in pixels) for `img.resize` once.
@@ -109,9 +101,35 @@ def image_to_terminal_art(image_file_or_path, target_width_pixels=None, target_h
     # Final sanity checks for dimensions
     width = max(1, width)
     height = max(2, height) # Minimum height of 2 to have at least one top/bottom pair
+    return width, height
+
 
-    # Only resize once after determining final dimensions
-    img = img.resize((width, height), Image.Resampling.LANCZOS)
+def image_to_terminal_art(image_file_or_path, target_width_pixels=None, target_height_pixels=None,
+                          max_width_chars=75, char_aspect_ratio=0.5, enable_true_color=True):
+    try:
+        # Use a context manager for the image to ensure it's closed
+        with Image.open(image_file_or_path) as img:
+            # The size is known from the header, before any pixels are decoded
+            width, height = _art_size(*img.size, target_width_pixels, target_height_pixels,
+                                      max_width_chars, char_aspect_ratio)
+            # Lets JPEGs decode at a reduced scale that still covers the target
+            # size; a no-op for other formats
+            img.draft("RGB", (width, height))
+            img = img.convert("RGB")
+    except FileNotFoundError:
+        print(f"File not found: {image_file_or_path}", file=sys.stderr)
+        return
+    except Exception as e:
+        print(f"Error opening image: {e}", file=sys.stderr)
+        return
+
+    # Each output cell is a single pixel, so plain area averaging (BOX) is
+    # enough when shrinking; LANCZOS costs more without a visible difference
+    if width < img.width and height < img.height:
+        resample = Image.Resampling.BOX
+    else:
+        resample = Image.Resampling.BILINEAR
+    img = img.resize((width, height), resample)
     arr = np.array(img)
 
     # --- Core Logic for ANSI Art Generation ---
@@ -121,28 +139,23 @@ def image_to_terminal_art(image_file_or_path, target_width_pixels=None, target_h
     top_rows = arr[::2]
     bottom_rows = arr[1::2]
 
-    output_lines = []
-
     if enable_true_color:
-        # Already vectorized, very efficient.
         fg_codes, bg_codes = generate_ansi_arrays_true_color(top_rows, bottom_rows)
-        # Combine using numpy's char functions, then join for each line.
-        # This replaces the Python loop for string concatenation per pixel.
-        combined_lines_np = np.char.add(np.char.add(fg_codes, bg_codes), "▄")
-        for line_array in combined_lines_np:
-            output_lines.append("".join(line_array) + RESET)
     else:
-        # NEW: Vectorized approach for 256-color mode as well.
-        # This will be significantly faster than the original Python loop calling get_cached_fg/bg
-        # for each pixel, as it leverages NumPy for the bulk of the work.
         fg_codes, bg_codes = generate_ansi_arrays_256_color(top_rows, bottom_rows)
-        combined_lines_np = np.char.add(np.char.add(fg_codes, bg_codes), "▄")
-        for line_array in combined_lines_np:
-            output_lines.append("".join(line_array) + RESET)
 
-    # Join all lines at once for a single print call.
-    # This reduces overhead compared to multiple `print` calls.
-    sys.stdout.write("\n".join(output_lines) + "\n") # Add final newline
+    # Lay every row out as fg, bg, "▄" per cell followed by the line end, so
+    # a row is a single join with no intermediate string per cell
+    rows, cols = fg_codes.shape
+    grid = np.empty((rows, cols * 3 + 1), dtype=object)
+    grid[:, 0:-1:3] = fg_codes
+    grid[:, 1:-1:3] = bg_codes
+    grid[:, 2:-1:3] = "▄"
+    grid[:, -1] = RESET + "\n"
+
+    # Hand each row to stdout as soon as it is joined, rather than keeping
+    # every row and then one more copy of the whole image as a single string
+    sys.stdout.writelines("".join(row) for row in grid.tolist())
 
 
 if __name__ == '__main__':
@@ -2,6 +2,7 @@
 
 import requests
 from bs4 import BeautifulSoup
+from core.session import make_session
 
 HEADERS = {
     "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) "
@@ -10,10 +11,16 @@ HEADERS = {
     "Accept-Language": "en-US,en;q=0.9"
 }
 
+# Reused across searches so repeated queries keep their connections alive.
+# No retries: hybrid_search relies on a failing engine giving up quickly so
+# it can fall back to the next one.
+_session = make_session()
+_session.headers.update(HEADERS)
+
 def search_google(query):
     url = f"https://www.google.com/search?q={requests.utils.quote(query)}"
     try:
-        response = requests.get(url, headers=HEADERS, timeout=5)
+        response = _session.get(url, timeout=5)
         if "Our systems have detected unusual traffic" in response.text:
             return None  # fallback trigger
 
@@ -37,7 +44,7 @@ def search_google(query):
 def search_duckduckgo(query):
     url = f"https://html.duckduckgo.com/html/?q={requests.utils.quote(query)}"
     try:
-        response = requests.post(url, headers=HEADERS, timeout=5)
+        response = _session.post(url, timeout=5)
         soup = BeautifulSoup(response.text, "html.parser")
         results = []
         for result in soup.select(".result"):
@@ -0,0 +1,23 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from __version__ import __version__
+
+# Retry transient failures with backoff (0.3s, 0.6s) before giving up
+TRANSIENT_RETRY = Retry(total=2, backoff_factor=0.3, status_forcelist=[502, 503, 504])
+
+def make_session(pool_connections=4, pool_maxsize=8, max_retries=0):
+    """
+    Creates a requests.Session whose pooled connections are kept alive, so
+    repeated requests to the same host skip the TCP/TLS handshake.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        max_retries=max_retries,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers["User-Agent"] = f"baodweb/{__version__}"
+    return session
@@ -1,9 +1,13 @@
-import os,random,re,shutil,sys,time
+import atexit,codecs,functools,os,random,re,shutil,signal,sys,threading,time
 from datetime import datetime
+from collections import OrderedDict
+from itertools import zip_longest
 import requests
+from core.ansi import ANSI_ESCAPE
 from core.configman import ConfigManager
 from core.parser import SUPPORTED_TAGS, Parser
 from core.search import hybrid_search # Assuming search_engine.py is in the same directory
+from core.session import TRANSIENT_RETRY, make_session
 import html
 from __version__ import __version__, __author__, __description__, __license__
 
@@ -13,8 +17,38 @@ from urllib.parse import urljoin, urlparse
 if os.name == "nt":
     import msvcrt
 else:
+    import select
     import termios
     import tty
+
+# Test page file names; group 1 is the page name without any language suffix,
+# so "about-en.html" and "about.html" both give "about"
+_LANG_TEST_PATTERN = re.compile(r"^(.*?)(?:-(?:en|fr|es|de|cn|jp))?\.html$", re.IGNORECASE)
+# Matches localized start pages such as "start-page-fr.html"
+_LANG_FILE_PATTERN = re.compile(r"start-page-(.*?)\.html$", re.IGNORECASE)
+# highlight_html tokens. Group 1: Comments, Group 2: Doctype, Group 3: Tags, Group 4: Text
+# Each branch scans with a character class rather than a lazy ".*?", so an
+# unclosed comment or tag costs one linear pass instead of backtracking
+_TOKEN_RE = re.compile(
+    r'(<!--[^-]*(?:-(?!->)[^-]*)*-->)|(<!DOCTYPE[^>]*>)|(</?[\w:-]+(?:\s[^>]*)?>)|([^<]+)'
+)
+# Attributes within a tag: leading space, name, optional ="value"
+_ATTR_RE = re.compile(
+    r'(?P<space>\s+)(?P<name>[\w-]+)\s*(?P<value>=\s*(?P<quote>["\'])(.*?)(?P=quote))?'
+)
+# Tag name at the start of a tag's content, including a closing slash
+_TAGNAME_RE = re.compile(r'^\s*[\/]?\s*([\w\d:-]+)')
+# One key of raw terminal input: a CSI sequence, an SS3 sequence, another
+# escape, or a single character
+_KEY_PATTERN = re.compile(r"\x1b\[[0-?]*[ -/]*[@-~]|\x1bO.|\x1b.?|.", re.DOTALL)
+_ARROW_KEYS = {"\x1b[A": "UP", "\x1b[B": "DOWN", "\x1bOA": "UP", "\x1bOB": "DOWN"}
+# Text in front of the typed input on the bottom line
+_INPUT_PROMPT = "Search/Command (press up/down arrow to move, quit to exit): "
+# URLs starting with one of these are absolute or internal and never resolved
+_ABSOLUTE_URL_PREFIXES = ("http://", "https://", "file://", "test:", "config-page:")
+# A bare domain for 'go': contains a dot, no slashes, no colons (e.g. "example.com")
+_BARE_DOMAIN_RE = re.compile(r"[^/:]*\.[^/:]*\Z")
+
 print("────── BaodWeb Terminal Browser ───────")
 print(f"BaodWeb Terminal Browser version {__version__} by {__author__}")
 print(f"Description: {__description__}")
@@ -22,6 +56,7 @@ print(f"License: {__license__}")
 time.sleep(1)
 
 
+@functools.lru_cache(maxsize=None)
 def resource_path(relative_path):
     if getattr(sys, "frozen", False):
         base_path = sys._MEIPASS
@@ -29,102 +64,168 @@ def resource_path(relative_path):
         base_path = os.path.dirname(__file__)
     return os.path.join(base_path, relative_path)
 
-def highlight_html(html_str: str) -> str:
+@functools.lru_cache(maxsize=64)
+def _split_base_url(url):
     """
-    Highlights HTML source code with ANSI colors for better readability.
-    This version uses a more robust regex pattern and finditer to prevent
-    the entire document from being incorrectly colored as a comment.
+    Returns (url, base URL) for an external URL, defaulting the scheme to
+    https. The base is scheme://netloc/ so urljoin resolves consistently.
+    Cached because navigate and load_content both need it for the same URL.
+    """
+    parsed_url = urlparse(url)
+    if not parsed_url.scheme:
+        url = "https://" + url
+        parsed_url = urlparse(url)
+    return url, f"{parsed_url.scheme}://{parsed_url.netloc}/"
+
+def _split_keys(text):
+    """
+    Splits raw terminal input into keys. Up/down arrow sequences become "UP"
+    and "DOWN", other escape sequences become "" (ignored).
     """
-    # ANSI colors for terminal output
-    COLOR_TAG = "\x1b[34m"        # Blue for tags
-    COLOR_ATTR_NAME = "\033[38;2;206;131;77m"  # Orange for attribute names
-    COLOR_ATTR_VALUE = "\033[38;2;152;195;121m"  # Green for attribute values
-    COLOR_BRACKET = "\033[90m"    # Gray for brackets (<, >, /)
-    COLOR_DOCTYPE = "\033[36m"    # Cyan for doctype
-    COLOR_COMMENT = "\033[32m"    # Green for comments
-    COLOR_RESET = "\033[0m"       # Default reset
-
-    # A comprehensive regex pattern to match all key HTML parts
-    # Group 1: Comments, Group 2: Doctype, Group 3: Tags, Group 4: Text
-    token_pattern = re.compile(
-        r'(<!--.*?-->)|(<!DOCTYPE.*?>)|(<\/?[\w\d:-]+(?:\s+[^>]*?)?>)|([^<]+)', re.DOTALL
+    keys = []
+    for match in _KEY_PATTERN.finditer(text):
+        key = match.group(0)
+        if key.startswith("\x1b"):
+            key = _ARROW_KEYS.get(key, "")
+        keys.append(key)
+    return keys
+
+def _write_frame(frame):
+    """
+    Writes an assembled frame to the terminal. The frame is encoded once and
+    handed to the file descriptor with os.write, skipping the text and
+    buffered layers' per-write work entirely.
+    """
+    try:
+        fd = sys.stdout.fileno()
+    except (AttributeError, ValueError):  # stdout was replaced by a text-only stream
+        sys.stdout.write(frame)
+        sys.stdout.flush()
+        return
+    sys.stdout.flush()  # Keep ordering with text written before the frame
+    data = frame.encode(sys.stdout.encoding or "utf-8", errors="replace")
+    if os.name == "nt":
+        # The Windows console needs its own stream to translate from UTF-8
+        sys.stdout.buffer.write(data)
+        sys.stdout.buffer.flush()
+        return
+    view = memoryview(data)
+    while view:
+        view = view[os.write(fd, view):]
+
+# ANSI colors for highlight_html
+COLOR_TAG = "\x1b[34m"        # Blue for tags
+COLOR_ATTR_NAME = "\033[38;2;206;131;77m"  # Orange for attribute names
+COLOR_ATTR_VALUE = "\033[38;2;152;195;121m"  # Green for attribute values
+COLOR_BRACKET = "\033[90m"    # Gray for brackets (<, >, /)
+COLOR_DOCTYPE = "\033[36m"    # Cyan for doctype
+COLOR_COMMENT = "\033[32m"    # Green for comments
+COLOR_RESET = "\033[0m"       # Default reset
+
+def _highlight_attr(attr_match):
+    """re.sub callback coloring one attribute (and its value) inside a tag."""
+    space, name, value = attr_match.group("space", "name", "value")
+    if value is None:
+        return f"{space}{COLOR_ATTR_NAME}{name}{COLOR_RESET}"
+    return (
+        f"{space}{COLOR_ATTR_NAME}{name}{COLOR_RESET}"
+        f"{COLOR_BRACKET}={COLOR_RESET}"
+        f"{COLOR_ATTR_VALUE}{value.strip('= ')}{COLOR_RESET}"
     )
 
-    highlighted_parts = []
-    
-    # Regex to parse attributes within a tag
-    attr_pattern = re.compile(r'(\s+)([\w-]+)\s*(=\s*(["\'])(.*?)\4)?')
-
-    for match in token_pattern.finditer(html_str):
-        # Comments
-        if match.group(1):
-            highlighted_parts.append(COLOR_COMMENT + match.group(1) + COLOR_RESET)
-        # Doctype
-        elif match.group(2):
-            highlighted_parts.append(COLOR_DOCTYPE + match.group(2) + COLOR_RESET)
-        # Tags
-        elif match.group(3):
-            part = match.group(3)
-            tag_content = part[1:-1] # Remove the outer < and >
-            
-            highlighted_tag = ''
-            
-            # Color the leading bracket
-            highlighted_tag += COLOR_BRACKET + '<' + COLOR_RESET
-
-            # Find the tag name
-            tag_name_match = re.match(r'^\s*[\/]?\s*([\w\d:-]+)', tag_content)
-            if tag_name_match:
-                tag_name_str = tag_name_match.group(0)
-                # Color the leading slash if it exists
-                if tag_name_str.startswith('/'):
-                    highlighted_tag += COLOR_BRACKET + '/' + COLOR_RESET
-                    highlighted_tag += COLOR_TAG + tag_name_str[1:] + COLOR_RESET
-                else:
-                    highlighted_tag += COLOR_TAG + tag_name_str + COLOR_RESET
-                
-                # Process attributes
-                attr_string = tag_content[len(tag_name_str):]
-                last_pos = 0
-                for attr_match in attr_pattern.finditer(attr_string):
-                    highlighted_tag += attr_string[last_pos:attr_match.start()]
-                    highlighted_tag += attr_match.group(1) # Space
-                    highlighted_tag += COLOR_ATTR_NAME + attr_match.group(2) + COLOR_RESET # Attr name
-                    
-                    if attr_match.group(3):
-                        highlighted_tag += COLOR_BRACKET + '=' + COLOR_RESET
-                        highlighted_tag += COLOR_ATTR_VALUE + attr_match.group(3).strip('= ') + COLOR_RESET
-                    
-                    last_pos = attr_match.end()
-                
-                highlighted_tag += attr_string[last_pos:]
-            else:
-                # Fallback for malformed tags
-                highlighted_tag += tag_content
+def _highlight_token(match):
+    """re.sub callback coloring one comment, doctype, tag or text token."""
+    # Comments
+    if match.group(1):
+        return COLOR_COMMENT + match.group(1) + COLOR_RESET
+    # Doctype
+    if match.group(2):
+        return COLOR_DOCTYPE + match.group(2) + COLOR_RESET
+    # Plain Text
+    if not match.group(3):
+        return html.unescape(match.group(4))
+
+    # Tags
+    tag_content = match.group(3)[1:-1] # Remove the outer < and >
+
+    # Color the leading bracket
+    tag_parts = [COLOR_BRACKET + '<' + COLOR_RESET]
+
+    # Find the tag name
+    tag_name_match = _TAGNAME_RE.match(tag_content)
+    if tag_name_match:
+        tag_name_str = tag_name_match.group(0)
+        # Color the leading slash if it exists
+        if tag_name_str.startswith('/'):
+            tag_parts.append(COLOR_BRACKET + '/' + COLOR_RESET)
+            tag_parts.append(COLOR_TAG + tag_name_str[1:] + COLOR_RESET)
+        else:
+            tag_parts.append(COLOR_TAG + tag_name_str + COLOR_RESET)
 
-            # Color the trailing bracket
-            highlighted_tag += COLOR_BRACKET + '>' + COLOR_RESET
-            
-            highlighted_parts.append(highlighted_tag)
+        # Process attributes; text between attributes is kept as-is by sub()
+        tag_parts.append(_ATTR_RE.sub(_highlight_attr, tag_content[len(tag_name_str):]))
+    else:
+        # Fallback for malformed tags
+        tag_parts.append(tag_content)
 
-        # Plain Text
-        else:
-            highlighted_parts.append(html.unescape(match.group(4)))
+    # Color the trailing bracket
+    tag_parts.append(COLOR_BRACKET + '>' + COLOR_RESET)
+    return "".join(tag_parts)
 
-    # Add 4 spaces of indentation for each line
-    return "\n".join(["    " + line for line in "".join(highlighted_parts).splitlines()])
+def highlight_html(html_str: str) -> str:
+    """
+    Highlights HTML source code with ANSI colors for better readability.
+    Tokens are matched with one regex so the entire document is never
+    incorrectly colored as a comment; re.sub drives the iteration and
+    builds the output.
+    """
+    lines = _TOKEN_RE.sub(_highlight_token, html_str).splitlines()
+    if not lines:
+        return ""
+
+    # Add 4 spaces of indentation for each line, in a single join
+    return "    " + "\n    ".join(lines)
 
 
 
 # --- Renderer with Paging/Scrolling ---
+# (text, hash, visible length) record of an empty content row
+_BLANK_LINE = ("", hash(""), 0)
+
 class Renderer:
     def __init__(self, config_manager):
         self.config_manager = config_manager
         self.lines_buffer = []
+        # (text, hash, visible length) for each line in lines_buffer
+        self._line_records = []
         self._previous_frame_buffer = (
             []
-        )  # New: Stores the last rendered frame for diffing
+        )  # New: Stores the last rendered frame (as line records) for diffing
+        # Cursor-move escape for each content row, extended if the terminal grows
+        self._cursor_moves = tuple(f"\033[{i + 3};1H" for i in range(512))
+        # Terminal size cached between resizes; None means query it again.
+        # Only cached where SIGWINCH tells us about resizes (not on Windows).
+        self._term_size = None
+        if hasattr(signal, "SIGWINCH"):
+            signal.signal(signal.SIGWINCH, self._on_resize)
         self.current_title = ""  # Added: To store the title
+        self._scroll_offset = 0  # Scroll offset of the last rendered frame
+        self._last_usable_height = 0  # Content height of the last rendered frame
+        # Title bar output, rebuilt only when (title, width, color) changes
+        self._title_cache_key = None
+        self._title_cache_str = ""
+
+    def _on_resize(self, signum, frame):
+        self._term_size = None
+
+    def terminal_size(self):
+        """Returns the terminal size without an ioctl per call where possible."""
+        term_size = self._term_size
+        if term_size is None:
+            term_size = shutil.get_terminal_size((80, 24))
+            if hasattr(signal, "SIGWINCH"):
+                self._term_size = term_size
+        return term_size
 
     def render_to_buffer(self, elements, title="No Title"):
         self.current_title = title  # Store the title
@@ -133,24 +234,25 @@ class Renderer:
         # The title formatting is moved to render_page or handled there directly
         # based on self.current_title. Here, we only prepare the content buffer.
 
-        lines = [""]  # Start with an empty line to account for the title line
+        parts = ["\n"]  # Start with an empty line to account for the title line
         other_elements = [
             e
             for e in elements
             if not (hasattr(e, "tag_type") and e.tag_type == "title")
         ]
         for element in other_elements:
-            if hasattr(
-                element, "tag_type"
-            ) and not self.config_manager.should_render_tag(element.tag_type):
-                continue
-            if hasattr(element, "elements"):
-                rendered_self = element.render(enable_color)
-                if rendered_self:
-                    lines.extend(rendered_self.splitlines())
-            else:
-                lines.extend(element.render(enable_color).splitlines())
-        self.lines_buffer = lines
+            rendered = element.render(enable_color)
+            if rendered:
+                # Terminate every element's output so elements never share a line
+                parts.append(rendered if rendered.endswith("\n") else rendered + "\n")
+        # Split the whole page once instead of once per element
+        self.lines_buffer = "".join(parts).splitlines()
+        # Hashed and measured once per page so each frame's diff compares ints,
+        # not long lines
+        self._line_records = [
+            (line, hash(line), len(ANSI_ESCAPE.sub("", line)))
+            for line in self.lines_buffer
+        ]
 
     def clear(self):
         """Clears the entire terminal screen and resets the previous frame buffer."""
@@ -158,137 +260,249 @@ class Renderer:
         self._previous_frame_buffer = (
             []
         )  # Clear the buffer when the screen is fully cleared
+        self._title_cache_key = None  # The title bar was wiped too
 
-    def render_page(self, scroll_offset=0):
+    def render_page(self, scroll_offset=0, prefix="", suffix=""):
         """
         Renders the current page to the terminal, using a diffing approach
-        to reduce flickering.
+        to reduce flickering. `prefix` and `suffix` hold escapes that must
+        reach the terminal before and after the frame, and are written in
+        the same call.
         """
-        term_height = shutil.get_terminal_size((80, 24)).lines
+        # Read the size once per frame; it cannot change mid-frame
+        term_size = self.terminal_size()
+        term_height = term_size.lines
+        box_width = term_size.columns  # Use full terminal width for title bar
+        enable_color = self.config_manager.is_color_enabled()
 
-        # Calculate usable height considering 1 line for title and 2 for input/prompt
-        usable_height = term_height - 3
+        # Calculate usable height considering 2 lines for title and 2 for input/prompt
+        usable_height = term_height - 4
 
         total_lines = len(self.lines_buffer)
 
         # Ensure scroll_offset is within valid bounds
         scroll_offset = max(0, min(scroll_offset, max(0, total_lines - usable_height)))
 
-        visible_lines = self.lines_buffer[scroll_offset : scroll_offset + usable_height]
+        visible_lines = self._line_records[scroll_offset : scroll_offset + usable_height]
+        if usable_height > len(self._cursor_moves):
+            self._cursor_moves = tuple(f"\033[{i + 3};1H" for i in range(usable_height))
+        cursor_moves = self._cursor_moves
 
+        # Nothing to write if the title bar and every visible line are already
+        # on screen (e.g. a repaint at a scroll boundary). Unchanged rows are
+        # the same record objects, so the list comparison is cheap.
+        title_key = (self.current_title, box_width, enable_color)
+        if (
+            not prefix
+            and title_key == self._title_cache_key
+            and visible_lines == self._previous_frame_buffer
+        ):
+            self._scroll_offset = scroll_offset
+            self._last_usable_height = usable_height
+            return scroll_offset, usable_height, total_lines
+
+        out = [prefix]
         # Move cursor to home position
-        sys.stdout.write("\033[H")
+        out.append("\033[H")
 
         # --- Render Title Bar ---
-        enable_color = self.config_manager.is_color_enabled()
+        if title_key != self._title_cache_key:
+            self._title_cache_key = title_key
+            self._title_cache_str = self._build_title_bar(box_width, enable_color)
+        out.append(self._title_cache_str)
+
+        # Compare current visible lines with the previous frame buffer. Rows
+        # missing from the shorter frame compare as blank, so rows left over
+        # from a longer previous frame get cleared.
+        for i, (current, previous) in enumerate(
+            zip_longest(visible_lines, self._previous_frame_buffer, fillvalue=_BLANK_LINE)
+        ):
+            # Equal hashes still compare the strings to rule out a collision
+            if current[1] != previous[1] or current[0] != previous[0]:
+                # Move cursor to the start of the current content line
+                # (content starts on line 3, after 2 title lines)
+                out.append(cursor_moves[i])
+                out.append(current[0])
+                # Clear to end of line if the new line is visibly shorter
+                if current[2] < previous[2]:
+                    out.append("\033[K")
+
+        out.append(suffix)
+        # Write the whole frame at once and make it immediately visible
+        _write_frame("".join(out))
+
+        # Update the previous frame buffer for the next render
+        self._previous_frame_buffer = visible_lines  # Slicing already made a copy
+        self._scroll_offset = scroll_offset
+        self._last_usable_height = usable_height
+
+        return scroll_offset, usable_height, total_lines
+
+    def usable_height(self):
+        """Number of content lines shown by the last rendered frame."""
+        return self._last_usable_height
+
+    def total_lines(self):
+        """Number of lines in the rendered page buffer."""
+        return len(self.lines_buffer)
+
+    def buffer_state(self):
+        """The rendered page, in a form restore_buffer_state() accepts."""
+        return self.current_title, self.lines_buffer, self._line_records
+
+    def restore_buffer_state(self, state):
+        """Makes a page saved with buffer_state() current again without re-rendering it."""
+        self.current_title, self.lines_buffer, self._line_records = state
+
+    def _build_title_bar(self, box_width, enable_color):
+        """Builds the terminal window title and the two-line title bar."""
         CYAN_BOLD = "\033[1;36m" if enable_color else ""
         RESET = "\033[0m" if enable_color else ""
         # Set the terminal window title
-        terminal_title = f"baodweb - {self.current_title}"
-        sys.stdout.write(f"\x1b]0;{terminal_title}\a")
-        # MODIFICATION END
+        terminal_title = f"\x1b]0;baodweb - {self.current_title}\a"
         title_text = f"  {self.current_title}  "
-        box_width = shutil.get_terminal_size(
-            (80, 24)
-        ).columns  # Use full terminal width for title bar
 
-        # Truncate title if it's too long
+        # Truncate title if it's too long, otherwise center it in the box
         if len(title_text) > box_width:
             title_text = title_text[: box_width - 3] + "..."
+        else:
+            title_text = title_text.center(box_width)
 
-        # Center the title within the available width
-        padding_left = (box_width - len(title_text)) // 2
-        padding_right = box_width - len(title_text) - padding_left
-
-        sys.stdout.write(
-            f"{CYAN_BOLD}{' ' * padding_left}{title_text}{' ' * padding_right}{RESET}\n"
+        return (
+            f"{terminal_title}"
+            f"{CYAN_BOLD}{title_text}{RESET}\n"
+            f"{CYAN_BOLD}{'─' * box_width}{RESET}\n"
         )
-        sys.stdout.write(f"{CYAN_BOLD}{'─' * box_width}{RESET}\n")
-
-        # Move cursor to the start of the content area (after the title bar)
-        sys.stdout.write(
-            f"\033[4;1H"
-        )  # Line 4 (1-indexed) is where content starts after title bar
-
-        # Compare current visible lines with the previous frame buffer
-        max_len = max(len(visible_lines), len(self._previous_frame_buffer))
-        for i in range(max_len):
-            current_line = visible_lines[i] if i < len(visible_lines) else ""
-            previous_line = (
-                self._previous_frame_buffer[i]
-                if i < len(self._previous_frame_buffer)
-                else ""
-            )
 
-            if current_line != previous_line:
-                # Move cursor to the start of the current content line
-                # +3 because content starts on line 3 (after 2 title lines)
-                sys.stdout.write(f"\033[{i + 3};1H")
-                sys.stdout.write(current_line)
-                # Clear to end of line if the new line is shorter than the old one
-                if len(current_line) < len(previous_line):
-                    sys.stdout.write("\033[K")
-
-            # If we're past the end of current_line but there was a previous_line, clear it
-            elif i >= len(visible_lines) and i < len(self._previous_frame_buffer):
-                sys.stdout.write(f"\033[{i + 4};1H")  # +4 as above
-                sys.stdout.write("\033[K")
-
-        # If the new frame has fewer lines than the previous, clear the extra lines at the bottom
-        if len(visible_lines) < len(self._previous_frame_buffer):
-            for i in range(len(visible_lines), len(self._previous_frame_buffer)):
-                sys.stdout.write(f"\033[{i + 4};1H")  # +4 as above
-                sys.stdout.write("\033[K")
-
-        sys.stdout.flush()  # Ensure changes are immediately visible
+    def scroll_by(self, delta, keep_cursor=False):
+        """
+        Scrolls the content area by `delta` lines. The terminal shifts the rows
+        already on screen inside a scroll region, so render_page only has to
+        write the newly exposed lines. With `keep_cursor` the cursor is saved
+        and restored around the frame, in the same write.
+        """
+        term_height = self.terminal_size().lines
+        usable_height = term_height - 4
+        total_lines = len(self.lines_buffer)
 
-        # Update the previous frame buffer for the next render
-        self._previous_frame_buffer = list(visible_lines)  # Make a copy
+        max_offset = max(0, total_lines - usable_height)
+        new_offset = max(0, min(self._scroll_offset + delta, max_offset))
+        delta = new_offset - self._scroll_offset
+        if delta == 0:
+            return self._scroll_offset, usable_height, total_lines
+
+        # The previous frame is only a valid model of the screen if it filled
+        # the content area at the current terminal height.
+        region_shift = ""
+        if abs(delta) < usable_height and len(self._previous_frame_buffer) == usable_height:
+            # Content rows are 3..usable_height + 2 (1-indexed); 'S' shifts the
+            # region up (scrolling down the page), 'T' shifts it down.
+            direction = "S" if delta > 0 else "T"
+            region_shift = f"\033[3;{usable_height + 2}r\033[{abs(delta)}{direction}\033[r"
+            blank_lines = [_BLANK_LINE] * abs(delta)
+            if delta > 0:
+                self._previous_frame_buffer = self._previous_frame_buffer[delta:] + blank_lines
+            else:
+                self._previous_frame_buffer = blank_lines + self._previous_frame_buffer[:delta]
 
-        return scroll_offset, usable_height, total_lines
+        # The shift goes out in the same write as the newly exposed lines
+        if keep_cursor:
+            return self.render_page(new_offset, prefix="\0337" + region_shift, suffix="\0338")
+        return self.render_page(new_offset, prefix=region_shift)
 
 # --- Dashboard Content Generator (Simulated Plugins) ---
 class DashboardContentGenerator:
+    WEATHER_CACHE_TTL = 600  # Seconds before cached weather is refreshed
+    WEATHER_RETRY_TTL = 60  # Seconds before a failed fetch is retried
+
     def __init__(self, location="London", weather_api_key=None):
         self.location = location
         self.weather_api_key = weather_api_key
         self.WEATHER_API_BASE_URL = "http://api.weatherapi.com/v1/current.json"
+        self.session = make_session()
+        # (monotonic expiry time, formatted weather or None until a fetch succeeds)
+        self._weather_cache = None
+        self._weather_lock = threading.Lock()
+        self._weather_refreshing = False
+        # Bumped by refresh_weather; results of fetches started before are dropped
+        self._weather_generation = 0
 
     def get_local_time(self):
         now = datetime.now()
         return now.strftime("%Y-%m-%d %H:%M:%S")
 
     def get_weather_data(self):
-        if self.weather_api_key and self.location:
-            params = {"key": self.weather_api_key, "q": self.location}
-            try:
-                response = requests.get(
-                    self.WEATHER_API_BASE_URL, params=params, timeout=5
-                )
-                response.raise_for_status()
-                data = response.json()
-                if "current" in data and "location" in data:
-                    temp_c = data["current"]["temp_c"]
-                    condition_text = data["current"]["condition"]["text"]
-                    city = data["location"]["name"]
-                    region = data["location"]["region"]
-                    return f"{temp_c}°C, {condition_text} in {city}, {region}"
-                else:
-                    print(
-                        "WeatherAPI response missing 'current' or 'location' data.",
-                        file=sys.stderr,
-                    )
-                    return self._get_simulated_weather_data()
-            except requests.exceptions.RequestException as e:
-                print(
-                    f"Error fetching weather from WeatherAPI.com: {e}", file=sys.stderr
-                )
-                return self._get_simulated_weather_data()
-            except Exception as e:
-                print(f"Unexpected error parsing weather data: {e}", file=sys.stderr)
-                return self._get_simulated_weather_data()
-        else:
+        """
+        Returns the cached weather without waiting on the network. When the
+        cache is missing or has expired a refresh is started in the
+        background and the stale (or simulated) value is returned.
+        """
+        if not (self.weather_api_key and self.location):
             return self._get_simulated_weather_data()
+        with self._weather_lock:
+            cached = self._weather_cache
+            if cached is None or time.monotonic() >= cached[0]:
+                if not self._weather_refreshing:
+                    self._weather_refreshing = True
+                    threading.Thread(
+                        target=self._refresh_weather,
+                        args=(self._weather_generation,),
+                        daemon=True,
+                    ).start()
+        weather = cached[1] if cached else None
+        return weather if weather is not None else self._get_simulated_weather_data()
+
+    def refresh_weather(self):
+        """
+        Drops the cached weather so the next get_weather_data fetches it again.
+        A fetch still running with the old key or location is ignored.
+        """
+        with self._weather_lock:
+            self._weather_cache = None
+            self._weather_generation += 1
+            self._weather_refreshing = False
+
+    def _refresh_weather(self, generation):
+        weather = None
+        try:
+            weather = self._fetch_weather_data()
+        finally:
+            with self._weather_lock:
+                # A refresh_weather call since this fetch started makes its
+                # result stale, and a newer fetch may already be running
+                if generation == self._weather_generation:
+                    if weather is not None:
+                        self._weather_cache = (time.monotonic() + self.WEATHER_CACHE_TTL, weather)
+                    else:
+                        # Failures are cached too, so a bad key or a missing
+                        # network is not retried on every dashboard render.
+                        # The last good weather (if any) is kept meanwhile.
+                        previous = self._weather_cache[1] if self._weather_cache else None
+                        self._weather_cache = (time.monotonic() + self.WEATHER_RETRY_TTL, previous)
+                    self._weather_refreshing = False
+
+    def _fetch_weather_data(self):
+        """
+        Fetches the current weather from WeatherAPI.com, or None on failure.
+        This runs on the background refresh thread, so errors are not printed:
+        they would land on top of the drawn page and the input prompt.
+        """
+        params = {"key": self.weather_api_key, "q": self.location}
+        try:
+            response = self.session.get(
+                self.WEATHER_API_BASE_URL, params=params, timeout=5
+            )
+            response.raise_for_status()
+            data = response.json()
+            if "current" in data and "location" in data:
+                temp_c = data["current"]["temp_c"]
+                condition_text = data["current"]["condition"]["text"]
+                city = data["location"]["name"]
+                region = data["location"]["region"]
+                return f"{temp_c}°C, {condition_text} in {city}, {region}"
+        except Exception:  # Network errors and malformed responses alike
+            pass
+        return None
 
     def _get_simulated_weather_data(self):
         temperatures = [25, 26, 27, 28, 29, 30, 31, 32]
@@ -312,9 +526,7 @@ class DashboardContentGenerator:
         weather = self.get_weather_data()
         news_list_html = ""
         if news_items := self.get_news_headlines():
-            news_list_html = (
-                "<ul>" + "".join([f"<li>{item}</li>" for item in news_items]) + "</ul>"
-            )
+            news_list_html = f"<ul>{''.join(f'<li>{item}</li>' for item in news_items)}</ul>"
         else:
             news_list_html = "<p>No news available.</p>"
         dashboard_html = f"""
@@ -340,8 +552,83 @@ class DashboardContentGenerator:
         return dashboard_html
 
 
+# Template for the "config" page, filled in by Browser._build_config_html
+_CONFIG_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Current Configuration</title>
+</head>
+<body>
+    <h1>TUI Browser Configuration</h1>
+    <p>This page displays the current settings loaded from your 'config' file.</p>
+    <h2>General Settings</h2>
+    <ul>
+        <li><b>Enable Color:</b> {enable_color}</li>
+        <li><b>Language:</b> {language}</li>
+        <li><b>First Run:</b> {first_run}</li>
+        <li><b>Weather API Key:</b> {weather_api_key}</li>
+        <li><b>Weather Location:</b> {weather_location}</li>
+    </ul>
+    <h2>Render Settings (1 = Enabled, 0 = Disabled)</h2>
+    <table>
+        <thead>
+            <tr>
+                <th>Tag Name</th>
+                <th>Status</th>
+            </tr>
+        </thead>
+        <tbody>
+        {render_rows}
+        </tbody>
+    </table>
+</body>
+</html>
+"""
+# Tags listed on the config page, sorted once instead of on every view
+_SORTED_SUPPORTED_TAGS = tuple(sorted(SUPPORTED_TAGS))
+# One row of the config page's render settings table: tag name, status
+_RENDER_ROW_TEMPLATE = "<tr><td>&lt;%s&gt;</td><td>%s</td></tr>"
+# The search results page; results_html is the list of entries below
+_SEARCH_PAGE_TEMPLATE = """
+<!DOCTYPE html>
+<html>
+<head>
+    <title>Search Results for '{query}'</title>
+</head>
+<body>
+    <h1>Search Results for "{query}"</h1>
+    <p>Search performed using: {engine_used}</p>
+    <hr/>
+{results_html}
+    <p>Type 'go &lt;url&gt;', 'click &lt;id&gt;', or 'back' to navigate.</p>
+</body>
+</html>
+"""
+# One entry of the search results list
+_SEARCH_RESULT_TEMPLATE = """
+                <li>
+                    <h3><a href="{url}">{title}</a> [<a href="cmd:click {anchor_id}">click {anchor_id}</a>]</h3>
+                    <p>{snippet}</p>
+                    <p><small>{url}</small></p>
+                </li>
+                """
+
+
+# --- Helper for search results: the text/href pair a click needs ---
+class _SearchAnchor:
+    __slots__ = ("text", "href")
+
+    def __init__(self, text, href):
+        self.text = text
+        self.href = href
+
+
 # --- Browser ---
 class Browser:
+    MAX_PAGE_BYTES = 5 * 1024 * 1024  # Larger pages are refused rather than buffered
+    PAGE_CACHE_SIZE = 16  # Rendered pages kept so 'back' can skip fetching and parsing
+
     def __init__(self, debug=False):
         self.history = []
         self.current_url = None
@@ -361,7 +648,98 @@ class Browser:
         self._next_anchor_id = [1]
         self.debug = debug
         self.scroll_offset = 0
-        
+        # Retry transient failures before showing an error page
+        self.session = make_session(max_retries=TRANSIENT_RETRY)
+        # Local HTML files (start pages, test pages, error templates) keyed by path
+        self._template_cache = {}
+        # Error pages are loaded up front so the failure paths don't touch disk
+        self._err_403 = self._read_error_template(
+            "error/403.html",
+            "<title>Error</title><h1>Error: {error}</h1>"
+            "<p>Failed to load error page template for {url}</p>",
+        )
+        self._err_unexpected = self._read_error_template(
+            "error/unexpected.html",
+            "<title>Error</title><h1>An unexpected error occurred: {error}</h1>",
+        )
+        # (buffer, width, height) of the last drawn input bar, None forces a redraw
+        self._last_input_state = None
+        # Separator line above the input bar, rebuilt only when the width changes
+        self._separator = ""
+        self._separator_width = None
+        # (config version, HTML) of the last generated configuration page
+        self._config_html_cache = (None, "")
+        # (page HTML, highlighted source) of the last 'source' view
+        self._highlight_cache = (None, "")
+        # Rendered pages by (url, terminal width, config version), oldest first
+        self._page_cache = OrderedDict()
+        # Keys read from the terminal in the same burst but not handled yet
+        self._pending_keys = []
+        # Keeps multi-byte characters split across reads intact (POSIX only)
+        self._key_decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        # handle_input dispatch: exact commands, then (prefix, handler) pairs
+        # whose handler gets the rest of the input
+        self._commands = {
+            "up": self.scroll_up,
+            "k": self.scroll_up,
+            "down": self.scroll_down,
+            "j": self.scroll_down,
+            "dashboard": lambda: self.navigate("dashboard"),
+            "back": self.go_back,
+            "list-tests": self.list_test_pages,
+            "list-languages": self.list_available_languages,
+            "config": self._show_config_page,
+            "source": self._show_source,
+        }
+        self._prefix_commands = (
+            ("go ", self._cmd_go),
+            ("search ", self._cmd_search),
+            ("s ", self._cmd_search), # Shortcut for search
+            ("test ", self._cmd_test),
+            ("click ", self._cmd_click),
+            ("config ", self._cmd_config),
+        )
+
+    def _read_template(self, path):
+        """Returns the contents of a local HTML file, reading it from disk only once."""
+        if path not in self._template_cache:
+            with open(path, "r", encoding="utf-8") as f:
+                self._template_cache[path] = f.read()
+        return self._template_cache[path]
+
+    def _read_first_template(self, *paths):
+        """
+        Returns the contents of the first of `paths` that exists. Opening the
+        file is the existence check, so a missing candidate costs one failed
+        open rather than a stat followed by an open.
+        """
+        for path in paths:
+            try:
+                return self._read_template(path)
+            except FileNotFoundError:
+                continue
+        raise FileNotFoundError(f"Neither {' nor '.join(paths)} found.")
+
+    def _read_error_template(self, name, fallback):
+        """Returns an error page template, or the fallback if the file is missing."""
+        try:
+            with open(resource_path(name), "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            return fallback
+
+    def _filter_elements(self, elements):
+        """
+        Drops top-level elements whose tag is disabled by a 'render-<tag>'
+        setting. Done once per page load so the renderer walks a dense list.
+        """
+        return [
+            element
+            for element in elements
+            if not hasattr(element, "tag_type")
+            or self.config_manager.should_render_tag(element.tag_type)
+        ]
+
     def _show_ansi_test_page(self):
         ansi_lines = []
         ansi_lines.append("<html><head><title>ANSI Test</title></head><body>")
@@ -435,6 +813,7 @@ class Browser:
         self.current_url = "test:ansi-start"
         self.last_html = html_content
         elements, page_title = self.parser.parse(html_content, self._current_anchors, self._next_anchor_id)
+        elements = self._filter_elements(elements)
         self.current_title = page_title or "ANSI Test"
         self.renderer.render_to_buffer(elements, self.current_title)
         self.scroll_offset = 0
@@ -495,16 +874,15 @@ class Browser:
             # 1. If it's already absolute (http/s, file, test:, config-page:), proceed.
             # 2. If it's a bare domain (e.g., "example.com"), prepend "https://".
             # 3. Otherwise (looks like a relative path, e.g., "/foo", "bar/baz.html"), consider it an error.
-            if not url.startswith(("http://", "https://", "file://", "test:", "config-page:")):
-                # Check for bare domain pattern (contains a dot, no slashes, no colons)
-                if '.' in url and '/' not in url and ':' not in url:
+            if not url.startswith(_ABSOLUTE_URL_PREFIXES):
+                if _BARE_DOMAIN_RE.match(url):
                     url = "https://" + url
                 else: # Looks like a relative path or invalid bare domain for 'go'
                     print(f"Error: 'go' command requires a full URL (e.g., 'https://example.com') or a bare domain (e.g., 'example.com'). Relative paths (like '{original_url}') are not supported by 'go'.", file=sys.stderr)
                     return # Stop navigation
         
         # Now, handle the URL (either corrected from 'go' or passed from 'click'/'internal')
-        is_absolute_or_internal = url.startswith(("http://", "https://", "file://", "test:", "config-page:"))
+        is_absolute_or_internal = url.startswith(_ABSOLUTE_URL_PREFIXES)
 
         # If it's a relative URL and we have a base URL, resolve it
         if not is_absolute_or_internal and self._base_url:
@@ -514,9 +892,7 @@ class Browser:
         elif is_absolute_or_internal:
             # If it's an external absolute URL, set its base as the new _base_url
             if url.startswith(("http://", "https://")):
-                parsed_url = urlparse(url)
-                # Ensure the base URL always ends with a slash if it's a domain base
-                self._base_url = f"{parsed_url.scheme}://{parsed_url.netloc}/"
+                _, self._base_url = _split_base_url(url)
             else: # For internal commands like test:, config-page:, file://
                 self._base_url = None # Explicitly set to None for internal pages
         
@@ -529,69 +905,50 @@ class Browser:
         current_lang = self.config_manager.get("language", "EN").lower()
         self._current_anchors = {}
         self._next_anchor_id = [1]
+        cache_key = self._page_cache_key()
         try:
             if url == "home" or url == "dashboard":
-                lang_home_path = resource_path(f"start-page-{current_lang}.html")
-                if os.path.exists(lang_home_path):
-                    with open(lang_home_path, "r", encoding="utf-8") as f:
-                        html_content = f.read()
-                    self._base_url = None # Local pages don't have an external base URL
-                else:
-                    default_home_path = resource_path("start-page.html")
-                    if os.path.exists(default_home_path):
-                        with open(default_home_path, "r", encoding="utf-8") as f:
-                            html_content = f.read()
-                        self._base_url = None # Local pages don't have an external base URL
-                    else:
-                        raise FileNotFoundError(
-                            f"Neither {lang_home_path} nor {default_home_path} found."
-                        )
+                html_content = self._read_first_template(
+                    resource_path(f"start-page-{current_lang}.html"),
+                    resource_path("start-page.html"),
+                )
+                self._base_url = None # Local pages don't have an external base URL
             elif url.startswith("test:"):
                 test_page_base_name = url[len("test:") :].strip()
-                lang_test_page_filename = f"{test_page_base_name}-{current_lang}.html"
-                lang_test_page_path = resource_path(
-                    os.path.join("test-pages", lang_test_page_filename)
+                html_content = self._read_first_template(
+                    resource_path(os.path.join("test-pages", f"{test_page_base_name}-{current_lang}.html")),
+                    resource_path(os.path.join("test-pages", f"{test_page_base_name}.html")),
                 )
-                if os.path.exists(lang_test_page_path):
-                    with open(lang_test_page_path, "r", encoding="utf-8") as f:
-                        html_content = f.read()
-                    self._base_url = None # Local pages don't have an external base URL
-                else:
-                    default_test_page_filename = f"{test_page_base_name}.html"
-                    default_test_page_path = resource_path(
-                        os.path.join("test-pages", default_test_page_filename)
-                    )
-                    if os.path.exists(default_test_page_path):
-                        with open(default_test_page_path, "r", encoding="utf-8") as f:
-                            html_content = f.read()
-                        self._base_url = None # Local pages don't have an external base URL
-                    else:
-                        raise FileNotFoundError(
-                            f"Neither {lang_test_page_path} nor {default_test_page_path} found."
-                        )
+                self._base_url = None # Local pages don't have an external base URL
             elif is_internal_html:
                 # Internal HTML content doesn't have a base URL.
                 self._base_url = None
                 html_content = url
             else:
-                # For external URLs, parse and set _base_url correctly
-                parsed_url = urlparse(url)
-                if not parsed_url.scheme: # If no scheme, default to https
-                    url = "https://" + url
-                    parsed_url = urlparse(url) # Re-parse with scheme
-                
-                # The base URL should be scheme://netloc/ (e.g., https://example.com/)
-                # This ensures consistent base URL for urljoin.
-                self._base_url = f"{parsed_url.scheme}://{parsed_url.netloc}/"
+                # For external URLs, add a missing scheme and set _base_url
+                url, self._base_url = _split_base_url(url)
                 
                 print(f"Fetching {url}...")
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                response.encoding = 'utf-8' # Force the encoding to UTF-8
-                html_content = response.text
+                # Fail fast on unreachable hosts (3s connect), allow slow pages (10s read)
+                # Stream the body so an oversized page is rejected after
+                # MAX_PAGE_BYTES instead of being held in memory in full
+                with self.session.get(url, timeout=(3, 10), stream=True) as response:
+                    response.raise_for_status()
+                    chunks = []
+                    total = 0
+                    for chunk in response.iter_content(65536):
+                        total += len(chunk)
+                        if total > self.MAX_PAGE_BYTES:
+                            raise ValueError(
+                                f"Page exceeds {self.MAX_PAGE_BYTES // (1024 * 1024)} MiB limit"
+                            )
+                        chunks.append(chunk)
+                html_content = b"".join(chunks).decode("utf-8", errors="replace")
+                del chunks
                 print(f"Successfully fetched {url}")
         except FileNotFoundError:
             self._base_url = None
+            cache_key = None # Don't keep error pages around for 'back'
             html_content = f"""
                 <title>404 File Not Found</title>
                 <h1>Error: File Not Found</h1>
@@ -600,62 +957,77 @@ class Browser:
             print(f"Error: Local file '{url}' not found.", file=sys.stderr)
         except requests.exceptions.RequestException as e:
             self._base_url = None
-            try:
-                with open(
-                    resource_path("error/403.html"), "r", encoding="utf-8"
-                ) as file:
-                    template = file.read()
-                html_content = template.replace("{error}", str(e)).replace("{url}", url)
-            except FileNotFoundError:
-                html_content = f"<title>Error</title><h1>Error: {e}</h1><p>Failed to load error page template for {url}</p>"
+            cache_key = None
+            html_content = self._err_403.replace("{error}", str(e)).replace("{url}", url)
             print(f"Error fetching {url}: {e}", file=sys.stderr)
         except Exception as e:
             self._base_url = None
-            try:
-                with open(
-                    resource_path("error/unexpected.html"), "r", encoding="utf-8"
-                ) as file:
-                    template = file.read()
-                html_content = f"{template}".replace("{error}", str(e))
-            except FileNotFoundError:
-                html_content = (
-                    f"<title>Error</title><h1>An unexpected error occurred: {e}</h1>"
-                )
+            cache_key = None
+            html_content = self._err_unexpected.replace("{error}", str(e))
             print(f"An unexpected error occurred: {e}", file=sys.stderr)
         self.last_html = html_content
         elements, page_title = self.parser.parse(
             html_content, self._current_anchors, self._next_anchor_id
         )
+        # Changing a render-* setting reloads the page, which re-applies the filter
+        elements = self._filter_elements(elements)
         self.current_title = page_title
         self.renderer.render_to_buffer(elements, self.current_title)
+        if cache_key is not None:
+            # The anchors are copied: later commands (search) change the
+            # live dict and counter in place before loading their own page
+            self._page_cache[cache_key] = (
+                html_content, self._base_url, dict(self._current_anchors),
+                list(self._next_anchor_id), self.renderer.buffer_state(),
+            )
+            self._page_cache.move_to_end(cache_key)
+            if len(self._page_cache) > self.PAGE_CACHE_SIZE:
+                self._page_cache.popitem(last=False)
         self.scroll_offset = 0
         self.renderer.clear() # Perform a full clear and redraw when content changes
         self.renderer.render_page(self.scroll_offset)
 
-    def scroll_up(self):
-        old_scroll_offset = self.scroll_offset
-        self.scroll_offset = max(0, self.scroll_offset - 1)
-        if (
-            old_scroll_offset != self.scroll_offset
-        ): # Only re-render if scroll position changed
-            self.renderer.render_page(self.scroll_offset)
-
-    def scroll_down(self):
-        old_scroll_offset = self.scroll_offset
-        _, usable_height, total_lines = self.renderer.render_page(
-            self.scroll_offset
-        ) # Get current state for boundary check
-        if self.scroll_offset + usable_height < total_lines:
-            self.scroll_offset += 1
-            if (
-                old_scroll_offset != self.scroll_offset
-            ): # Only re-render if scroll position changed
-                self.renderer.render_page(self.scroll_offset)
+    def _page_cache_key(self):
+        """Cache key for the current page, or None for pages that are always rebuilt."""
+        url = self.current_url
+        # The dashboard shows live data and the config page has its own cache
+        if not url or url in ("home", "dashboard") or url.startswith("config-page:"):
+            return None
+        return (url, self.renderer.terminal_size().columns, self.config_manager.version)
+
+    def _restore_cached_page(self):
+        """Shows the current page from the page cache. Returns False on a miss."""
+        key = self._page_cache_key()
+        entry = self._page_cache.get(key) if key else None
+        if entry is None:
+            return False
+        self._page_cache.move_to_end(key)
+        (self.last_html, self._base_url, anchors,
+         next_anchor_id, renderer_state) = entry
+        self._current_anchors = dict(anchors)
+        self._next_anchor_id = list(next_anchor_id)
+        self.renderer.restore_buffer_state(renderer_state)
+        self.current_title = self.renderer.current_title
+        self.scroll_offset = 0
+        self.renderer.clear()
+        self.renderer.render_page(self.scroll_offset)
+        return True
+
+    def scroll_up(self, lines=1, keep_cursor=False):
+        if self.scroll_offset > 0: # Only re-render if scroll position changes
+            self.scroll_offset, _, _ = self.renderer.scroll_by(-lines, keep_cursor)
+
+    def scroll_down(self, lines=1, keep_cursor=False):
+        # Boundary check against the last rendered frame, without re-rendering
+        if self.scroll_offset + self.renderer.usable_height() < self.renderer.total_lines():
+            self.scroll_offset, _, _ = self.renderer.scroll_by(lines, keep_cursor)
 
     def go_back(self):
         if len(self.history) > 1:
             self.history.pop()
             self.current_url = self.history[-1]
+            if self._restore_cached_page():
+                return
             if self.current_url.startswith("config-page:"):
                 self._show_config_page(add_to_history=False)
             elif self.current_url == "dashboard" or self.current_url == "home":
@@ -676,17 +1048,12 @@ class Browser:
             return
         print(f"\nAvailable test pages in '{test_pages_dir}':")
         found_pages = False
-        all_test_files_base_names = set()
-        lang_code_pattern = re.compile(
-            r"^(.*?)-(en|fr|es|de|cn|jp)\.html$", re.IGNORECASE
-        )
-        for filename in os.listdir(test_pages_dir):
-            if filename.endswith(".html"):
-                match = lang_code_pattern.match(filename)
-                if match:
-                    all_test_files_base_names.add(match.group(1))
-                else:
-                    all_test_files_base_names.add(filename[:-5])
+        with os.scandir(test_pages_dir) as entries:
+            all_test_files_base_names = {
+                _LANG_TEST_PATTERN.match(entry.name).group(1)
+                for entry in entries
+                if entry.name.endswith(".html") and entry.is_file()
+            }
         if all_test_files_base_names:
             for page_name in sorted(list(all_test_files_base_names)):
                 print(f"- {page_name}")
@@ -709,12 +1076,14 @@ class Browser:
 )
             return
         print(f"\nAvailable languages for start pages:")
-        found_languages = set()
-        lang_file_pattern = re.compile(r"start-page-(.*?)\.html$", re.IGNORECASE)
-        for filename in os.listdir(base_resource_dir):
-            match = lang_file_pattern.match(filename)
-            if match:
-                found_languages.add(match.group(1).upper())
+        with os.scandir(base_resource_dir) as entries:
+            found_languages = {
+                match.group(1).upper()
+                for match in map(
+                    _LANG_FILE_PATTERN.match, (e.name for e in entries if e.is_file())
+                )
+                if match
+            }
         if found_languages:
             for lang_code in sorted(list(found_languages)):
                 print(f"- {lang_code}")
@@ -730,38 +1099,17 @@ class Browser:
             )
 
     def _show_config_page(self, add_to_history=True):
-        config_html_content = """
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Current Configuration</title>
-</head>
-<body>
-    <h1>TUI Browser Configuration</h1>
-    <p>This page displays the current settings loaded from your 'config' file.</p>
-    <h2>General Settings</h2>
-    <ul>
-        <li><b>Enable Color:</b> {}</li>
-        <li><b>Language:</b> {}</li>
-        <li><b>First Run:</b> {}</li>
-        <li><b>Weather API Key:</b> {}</li>
-        <li><b>Weather Location:</b> {}</li>
-    </ul>
-    <h2>Render Settings (1 = Enabled, 0 = Disabled)</h2>
-    <table>
-        <thead>
-            <tr>
-                <th>Tag Name</th>
-                <th>Status</th>
-            </tr>
-        </thead>
-        <tbody>
-        {}
-        </tbody>
-    </table>
-</body>
-</html>
-        """
+        # The page only changes when a setting does, so rebuild it only then
+        cached_version, final_html = self._config_html_cache
+        if cached_version != self.config_manager.version:
+            final_html = self._build_config_html()
+            self._config_html_cache = (self.config_manager.version, final_html)
+        if add_to_history:
+            self.current_url = "config-page:current"
+            self.history.append(self.current_url)
+        self.load_content(final_html, is_internal_html=True)
+
+    def _build_config_html(self):
         enable_color_status = (
             "Enabled" if self.config_manager.is_color_enabled() else "Disabled"
         )
@@ -771,68 +1119,45 @@ class Browser:
             "weather_api_key", "Not Set (Simulated)"
         )
         weather_location_status = self.config_manager.get("weather_location", "Can Tho")
-        render_settings_rows = []
-        sorted_supported_tags = sorted(list(SUPPORTED_TAGS))
-        for tag in sorted_supported_tags:
-            status = self.config_manager.get(f"render-{tag}", "1")
-            render_settings_rows.append(
-                f"<tr><td>&lt;{tag}&gt;</td><td>{status}</td></tr>"
-            )
-        final_html = config_html_content.format(
-            enable_color_status,
-            current_language_setting,
-            first_run_status,
-            weather_api_key_status,
-            weather_location_status,
-            "\n".join(render_settings_rows),
+        render_settings = self.config_manager.get_many("render-")
+        render_settings_rows = "\n".join(
+            _RENDER_ROW_TEMPLATE % (tag, render_settings.get(tag, "1"))
+            for tag in _SORTED_SUPPORTED_TAGS
+        )
+        return _CONFIG_TEMPLATE.format(
+            enable_color=enable_color_status,
+            language=current_language_setting,
+            first_run=first_run_status,
+            weather_api_key=weather_api_key_status,
+            weather_location=weather_location_status,
+            render_rows=render_settings_rows,
         )
-        if add_to_history:
-            self.current_url = "config-page:current"
-            self.history.append(self.current_url)
-        self.load_content(final_html, is_internal_html=True)
 
     def handle_search_results(self, query, add_to_history=True):
         print(f"Searching for '{query}'...")
         results, engine_used = hybrid_search(query)
 
-        html_content = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <title>Search Results for '{query}'</title>
-</head>
-<body>
-    <h1>Search Results for "{query}"</h1>
-    <p>Search performed using: {engine_used}</p>
-    <hr/>
-"""
-        if results:
-            html_content += "<ul>"
-            for i, result in enumerate(results):
-                title = result.get('title', 'No Title')
-                url = result.get('url', '#')
-                snippet = result.get('snippet', 'No snippet available.')
-                # Assign an anchor ID to each search result for clicking
-                anchor_id = self._next_anchor_id[0]
-                self._current_anchors[anchor_id] = type('obj', (object,), {'text': title, 'href': url})()
-                self._next_anchor_id[0] += 1
-
-                html_content += f"""
-                <li>
-                    <h3><a href="{url}">{title}</a> [<a href="cmd:click {anchor_id}">click {anchor_id}</a>]</h3>
-                    <p>{snippet}</p>
-                    <p><small>{url}</small></p>
-                </li>
-                """
-            html_content += "</ul>"
+        entries = []
+        for result in results or ():
+            # Assign an anchor ID to each search result for clicking
+            anchor_id = self._next_anchor_id[0]
+            self._next_anchor_id[0] += 1
+            entry = {
+                "title": result.get('title', 'No Title'),
+                "url": result.get('url', '#'),
+                "snippet": result.get('snippet', 'No snippet available.'),
+                "anchor_id": anchor_id,
+            }
+            self._current_anchors[anchor_id] = _SearchAnchor(entry["title"], entry["url"])
+            entries.append(entry)
+
+        if entries:
+            results_html = f"<ul>{''.join(map(_SEARCH_RESULT_TEMPLATE.format_map, entries))}</ul>"
         else:
-            html_content += "<p>No search results found.</p>"
-
-        html_content += """
-    <p>Type 'go &lt;url&gt;', 'click &lt;id&gt;', or 'back' to navigate.</p>
-</body>
-</html>
-"""
+            results_html = "<p>No search results found.</p>"
+        html_content = _SEARCH_PAGE_TEMPLATE.format(
+            query=query, engine_used=engine_used, results_html=results_html
+        )
         if add_to_history:
             self.current_url = f"search-results:{query}"
             self.history.append(self.current_url)
@@ -840,94 +1165,100 @@ class Browser:
         self._base_url = None
         self.load_content(html_content, is_internal_html=True)
 
-    def handle_input(self, user_input):
-        if user_input in ("up", "k"):
-            self.scroll_up()
-        elif user_input in ("down", "j"):
-            self.scroll_down()
-        elif user_input.startswith("go "):
-            url = user_input[3:].strip()
-            self.navigate(url, is_go_command=True) # Pass is_go_command=True
-        elif user_input.startswith("search "):
-            query = user_input[len("search "):].strip()
-            self.handle_search_results(query)
-        elif user_input.startswith("s "): # Shortcut for search
-            query = user_input[len("s "):].strip()
-            self.handle_search_results(query)
-        elif user_input == "dashboard":
-            self.navigate("dashboard")
-        elif user_input.startswith("test "):
-            test_page = user_input[5:].strip()
-            self.navigate(f"test:{test_page}")
-        elif user_input.startswith("click "):
-            try:
-                anchor_id = int(user_input[len("click ") :].strip())
-                if anchor_id in self._current_anchors:
-                    anchor = self._current_anchors[anchor_id]
-                    print(
-                        f"Clicking link [{anchor_id}]: {anchor.text} -> {anchor.href}"
-                    )
-                    # The link from the anchor might be relative, so we use navigate()
-                    # with is_go_command=False (default) which handles relative resolution.
-                    self.navigate(anchor.href) 
-                else:
-                    print(
-                        f"Error: No link found with ID {anchor_id}. Please check the displayed link IDs."
-                    )
-            except ValueError:
-                print("Error: Invalid link ID. Please enter a number after 'click'.")
-        elif user_input == "back":
-            self.go_back()
-        elif user_input == "list-tests":
-            self.list_test_pages()
-        elif user_input == "list-languages":
-            self.list_available_languages()
-        elif user_input.startswith("config"):
-            parts = user_input.split(maxsplit=2)
-            if len(parts) == 1:
-                self._show_config_page()
-            elif len(parts) == 3:
-                option = parts[1].strip()
-                value = parts[2].strip()
-                if self.config_manager.set(option, value):
-                    if self.current_url and self.current_url.startswith("config-page:"):
-                        self._show_config_page(add_to_history=False)
-                    elif self.current_url == "dashboard" or self.current_url == "home":
-                        self.load_content("home")
-                    elif self.current_url:
-                        self.load_content(self.current_url)
-                    else:
-                        self.load_content("home")
-                else:
-                    print("Failed to update configuration. Please check your input")
+    def _cmd_go(self, url):
+        self.navigate(url.strip(), is_go_command=True) # Pass is_go_command=True
+
+    def _cmd_search(self, query):
+        self.handle_search_results(query.strip())
+
+    def _cmd_test(self, test_page):
+        self.navigate(f"test:{test_page.strip()}")
+
+    def _cmd_click(self, anchor_id):
+        try:
+            anchor_id = int(anchor_id.strip())
+            if anchor_id in self._current_anchors:
+                anchor = self._current_anchors[anchor_id]
+                print(
+                    f"Clicking link [{anchor_id}]: {anchor.text} -> {anchor.href}"
+                )
+                # The link from the anchor might be relative, so we use navigate()
+                # with is_go_command=False (default) which handles relative resolution.
+                self.navigate(anchor.href) 
             else:
-                print("Usage: config [option] [value]")
-                print("  config              - Show current configuration")
                 print(
-                    "  config <option> <value> - Set a configuration option (e.g., config enable-color 0)"
+                    f"Error: No link found with ID {anchor_id}. Please check the displayed link IDs."
                 )
-        # This is the new logic for the 'source' command.
-        elif user_input == "source":
-            if not self.last_html:
-                print("Error: No HTML content to display. Please browse to a page first.")
-                return
+        except ValueError:
+            print("Error: Invalid link ID. Please enter a number after 'click'.")
+
+    def _cmd_config(self, args):
+        parts = args.split(maxsplit=1)
+        if len(parts) == 2:
+            option = parts[0].strip()
+            value = parts[1].strip()
+            if self.config_manager.set(option, value):
+                if option == "language":
+                    # Localized pages resolve to different files now
+                    self._template_cache.clear()
+                elif option in ("weather_api_key", "weather_location"):
+                    self.dashboard_generator.weather_api_key = self.config_manager.get("weather_api_key", "")
+                    self.dashboard_generator.location = self.config_manager.get("weather_location", "Can Tho")
+                    self.dashboard_generator.refresh_weather()
+                if self.current_url and self.current_url.startswith("config-page:"):
+                    self._show_config_page(add_to_history=False)
+                elif self.current_url == "dashboard" or self.current_url == "home":
+                    self.load_content("home")
+                elif self.current_url:
+                    self.load_content(self.current_url)
+                else:
+                    self.load_content("home")
+            else:
+                print("Failed to update configuration. Please check your input")
+        else:
+            print("Usage: config [option] [value]")
+            print("  config              - Show current configuration")
+            print(
+                "  config <option> <value> - Set a configuration option (e.g., config enable-color 0)"
+            )
+
+    def _show_source(self):
+        if not self.last_html:
+            print("Error: No HTML content to display. Please browse to a page first.")
+            return
 
+        # Viewing the same page's source again reuses the highlighted text.
+        # The cache holds the HTML string itself, so an identity check is exact.
+        html_source, highlighted = self._highlight_cache
+        if html_source is not self.last_html:
             highlighted = highlight_html(self.last_html)
-            self.renderer.clear()
-            
-            # Print the title for the source view
-            print(f"--- Source Code for {self.current_url or 'Last Viewed Page'} ---")
-            
-            # Print the highlighted content directly to the console
-            print(highlighted)
-            
-            print("\n--- Press any key to return to the browser ---")
-            sys.stdout.flush()
-            
-            self._get_key()  # Wait for a key press
-            
-            self.renderer.clear()
-            self.renderer.render_page(self.scroll_offset) # Re-render the last page
+            self._highlight_cache = (self.last_html, highlighted)
+        self.renderer.clear()
+        
+        # Print the title for the source view
+        print(f"--- Source Code for {self.current_url or 'Last Viewed Page'} ---")
+        
+        # Print the highlighted content directly to the console
+        print(highlighted)
+        
+        print("\n--- Press any key to return to the browser ---")
+        sys.stdout.flush()
+        
+        self._get_key()  # Wait for a key press
+        
+        self.renderer.clear()
+        self.renderer.render_page(self.scroll_offset) # Re-render the last page
+
+    def handle_input(self, user_input):
+        # Whole-word commands first, then commands that take an argument
+        command = self._commands.get(user_input)
+        if command:
+            command()
+            return
+        for prefix, command in self._prefix_commands:
+            if user_input.startswith(prefix):
+                command(user_input[len(prefix):])
+                return
 
     def start(self):
         print("Welcome to the TUI Web Browser!")
@@ -935,6 +1266,19 @@ class Browser:
             "Commands: go <url>, search <query>, s <query>, dashboard, test <test-page-name>, back, list-tests, list-languages, config [option] [value], click <id>, up, down, quit, help"
         )
 
+        if os.name != "nt" and sys.stdin.isatty():
+            # Put the terminal into cbreak mode once for the whole session
+            # instead of switching modes around every key read. Unlike raw
+            # mode, cbreak keeps output processing, so print() still works.
+            fd = sys.stdin.fileno()
+            atexit.register(termios.tcsetattr, fd, termios.TCSADRAIN, termios.tcgetattr(fd))
+            tty.setcbreak(fd)
+            # As in raw mode, Ctrl-C and friends arrive as plain keys (and are
+            # ignored) instead of raising KeyboardInterrupt
+            mode = termios.tcgetattr(fd)
+            mode[3] &= ~termios.ISIG  # lflag
+            termios.tcsetattr(fd, termios.TCSANOW, mode)
+
         # Initial clear and render
         self._run_ansi_test_prompt()
         self.renderer.clear()
@@ -946,43 +1290,96 @@ class Browser:
 
         buffer = ""
         while True:
-            term_size = shutil.get_terminal_size((80, 24))
+            # Cached between SIGWINCHs, so a keystroke costs no ioctl
+            term_size = self.renderer.terminal_size()
             term_height = term_size.lines
             term_width = term_size.columns
 
-            # NEW: Separator above the input bar
-            sys.stdout.write(f"\033[{term_height - 1};1H")
-            sys.stdout.write("─" * term_width)
-
-            # Input prompt at the very bottom
-            sys.stdout.write(f"\033[{term_height};1H")
-            sys.stdout.write(
-                "Search/Command (press up/down arrow to move, quit to exit): "
-                + buffer
-                + "\033[K"
-            )
-            sys.stdout.flush()
+            # Only redraw the input bar when its content or the window changed
+            input_state = (buffer, term_width, term_height)
+            last_state = self._last_input_state
+            if input_state != last_state:
+                if last_state is not None and last_state[1:] == input_state[1:]:
+                    if buffer.startswith(last_state[0]):
+                        # Typed characters: the cursor is already at the end
+                        # of the prompt, so only the new text is written
+                        _write_frame(buffer[len(last_state[0]):])
+                    else:
+                        _write_frame(f"\033[{term_height};1H{_INPUT_PROMPT}{buffer}\033[K")
+                else:
+                    if term_width != self._separator_width:
+                        self._separator = "─" * term_width
+                        self._separator_width = term_width
+                    # Separator above the input bar and the input prompt at the
+                    # very bottom, written in one go
+                    _write_frame(
+                        f"\033[{term_height - 1};1H{self._separator}"
+                        f"\033[{term_height};1H{_INPUT_PROMPT}{buffer}\033[K"
+                    )
+                self._last_input_state = input_state
 
-            key = self._get_key()
+            key, count = self._get_key_burst()
             if key in ("\r", "\n"):  # Enter
-                sys.stdout.write(f"\033[{term_height};1H\033[K")
-                sys.stdout.flush()
+                _write_frame(f"\033[{term_height};1H\033[K")
 
                 if buffer.strip() == "quit":
                     print("Exiting browser.")
                     break
                 self.handle_input(buffer.strip())
                 buffer = ""
+                self._last_input_state = None  # The command may have redrawn the screen
             elif key in ("\x08", "\x7f"):  # Backspace
                 buffer = buffer[:-1]
-            elif key == "UP":
-                self.scroll_up()
-            elif key == "DOWN":
-                self.scroll_down()
+            elif key in ("UP", "DOWN"):
+                # Scrolling only changes the content area. The frame saves the
+                # cursor at the end of the prompt and restores it afterwards,
+                # so the input bar stays valid and is not redrawn.
+                if key == "UP":
+                    self.scroll_up(count, keep_cursor=True)
+                else:
+                    self.scroll_down(count, keep_cursor=True)
             elif key.isprintable():
                 buffer += key
+                # A paste arrives as a burst of keys. Take the printable ones
+                # that are already waiting, so the bar is redrawn once per
+                # burst instead of once per character.
+                while self._key_waiting():
+                    key = self._get_key()
+                    if not key:
+                        break
+                    if key in ("UP", "DOWN") or not key.isprintable():
+                        self._pending_keys.insert(0, key)
+                        break
+                    buffer += key
+
+    def _key_waiting(self):
+        """Checks, without blocking, whether another key can be read right away."""
+        if self._pending_keys:
+            return True
+        if os.name == "nt":
+            return msvcrt.kbhit()
+        return bool(select.select([sys.stdin.fileno()], [], [], 0)[0])
+
+    def _get_key_burst(self):
+        """
+        Reads one key and returns (key, count). Repeats of an UP/DOWN key that
+        are already waiting, e.g. from a held arrow key, are coalesced into a
+        single key so the page scrolls once per burst instead of once per key.
+        """
+        key = self._get_key()
+        count = 1
+        if key in ("UP", "DOWN"):
+            while self._key_waiting():
+                next_key = self._get_key()
+                if next_key != key:
+                    self._pending_keys.insert(0, next_key)
+                    break
+                count += 1
+        return key, count
 
     def _get_key(self):
+        if self._pending_keys:
+            return self._pending_keys.pop(0)
         if os.name == "nt":
             while True:
                 ch = msvcrt.getwch()
@@ -997,24 +1394,20 @@ class Browser:
                 else:
                     return ch
         else:
+            # The terminal is already in cbreak mode (see start())
             fd = sys.stdin.fileno()
-            old_settings = termios.tcgetattr(fd)
-            try:
-                tty.setraw(fd)
-                ch = sys.stdin.read(1)
-                if ch == "\x1b":
-                    ch2 = sys.stdin.read(1)
-                    if ch2 == "[":
-                        ch3 = sys.stdin.read(1)
-                        if ch3 == "A":
-                            return "UP"
-                        elif ch3 == "B":
-                            return "DOWN"
-                    return ""
-                else:
-                    return ch
-            finally:
-                termios.tcsetattr(fd, termios.TCSADRAIN, old_settings)
+            data = os.read(fd, 64)
+            # Drain the rest of the burst (escape sequences, held keys)
+            while data and select.select([fd], [], [], 0)[0]:
+                chunk = os.read(fd, 64)
+                if not chunk:
+                    break
+                data += chunk
+            keys = _split_keys(self._key_decoder.decode(data))
+            if not keys:  # EOF or an incomplete multi-byte character
+                return ""
+            self._pending_keys.extend(keys[1:])
+            return keys[0]
 
 
 # --- Main ---